@@ -0,0 +1,121 @@
+# Benchmark for the A1 escape-time pipeline
+# times grid construction, iteration, colour mapping and PNG encoding separately, and writes the results as JSON
+
+import argparse
+import io
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+from PIL import Image
+
+from pattern_generator import JULIA_VIEW, MANDELBROT_VIEW, colorize, colormap_lut, complex_grid, contrast_stops, escape_time
+
+# Default matrix
+RESOLUTIONS = [250, 500, 1000, 2000, 3000] # image width in pixels
+ITERATIONS = [100, 500, 1000, 2000]
+C_VALUES = [
+    0,  # Mandelbrot
+    -0.4 + 0.6j, # Julia
+    -0.8 + 0.156j, # classic julia
+    -1.476 + 0j, # deep sea coral
+]
+
+# Run one stage, returns its result, wall time and peak traced memory
+def measure(stage):
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    result = stage()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    return result, seconds, peak
+
+# Time every stage of the pipeline for one resolution, iteration count and c value
+def benchmark_case(resolution, n_iterations, c, **kwargs):
+    xmin, xmax, ymin, ymax = MANDELBROT_VIEW if c == 0 else JULIA_VIEW
+    pixel_density = resolution / (xmax - xmin)
+    stops = contrast_stops()
+    lut = colormap_lut(stops)
+
+    z_grid, grid_s, grid_peak = measure(lambda: complex_grid(xmin, xmax, ymin, ymax, pixel_density))
+    escape, iterate_s, iterate_peak = measure(lambda: escape_time(z_grid, c, n_iterations, **kwargs))
+    pixels, colour_s, colour_peak = measure(lambda: colorize(escape, lut))
+
+    def encode():
+        buf = io.BytesIO()
+        Image.fromarray(pixels, "RGB").save(buf, format="PNG")
+        return buf.tell()
+    png_bytes, encode_s, encode_peak = measure(encode)
+
+    n_pixels = escape.size
+    # iterations actually spent: escaped points stop at their count, the rest run to the limit
+    # (a count of 0 also means escaped on the first iteration, so this is an upper bound)
+    escaped = escape > 0
+    actual = int(np.sum(escape[escaped] + 1)) + int(np.count_nonzero(~escaped)) * n_iterations
+
+    return {
+        "c": [float(np.real(c)), float(np.imag(c))],
+        "resolution": list(escape.shape[::-1]),
+        "n_iterations": n_iterations,
+        "options": {key: value for key, value in kwargs.items()},
+        "seconds": {"grid": grid_s, "iterate": iterate_s, "colour": colour_s, "encode": encode_s},
+        "peak_bytes": {"grid": grid_peak, "iterate": iterate_peak, "colour": colour_peak, "encode": encode_peak},
+        "pixel_iterations_per_s": n_pixels * n_iterations / iterate_s,
+        "actual_pixel_iterations_per_s": actual / iterate_s,
+        "png_bytes": png_bytes,
+    }
+
+# Run the full matrix, print one line per case
+def run_benchmark(resolutions=RESOLUTIONS, iterations=ITERATIONS, c_values=C_VALUES, **kwargs):
+    results = []
+    tracemalloc.start()
+    try:
+        for resolution in resolutions:
+            for n_iterations in iterations:
+                for c in c_values:
+                    case = benchmark_case(resolution, n_iterations, c, **kwargs)
+                    results.append(case)
+                    s = case["seconds"]
+                    print(f"{resolution:>5} px {n_iterations:>5} it  c = {complex(c):<16} "
+                          f"grid {s['grid']:.3f} s  iterate {s['iterate']:.3f} s  colour {s['colour']:.3f} s  "
+                          f"encode {s['encode']:.3f} s  {case['pixel_iterations_per_s'] / 1e6:.1f} Mpix*it/s  "
+                          f"peak {max(case['peak_bytes'].values()) / 2**20:.0f} MB")
+    finally:
+        tracemalloc.stop()
+    return results
+
+# Write the results together with the machine and library versions, so runs can be compared over time
+def write_results(results, output):
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved benchmark results to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the A1 escape-time pipeline")
+    parser.add_argument("--resolutions", type=int, nargs="+", default=RESOLUTIONS)
+    parser.add_argument("--iterations", type=int, nargs="+", default=ITERATIONS)
+    parser.add_argument("--c", type=lambda text: [complex(value) for value in text.split(",")], default=C_VALUES,
+                        help="comma separated c values, e.g. --c=0,-0.4+0.6j (0 = Mandelbrot)")
+    parser.add_argument("--active-set", action="store_true", help="use the active-set loop")
+    parser.add_argument("--precision", choices=["double", "single"], default="double")
+    parser.add_argument("--output", default=os.path.join("benchmarks", f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"))
+    args = parser.parse_args()
+
+    results = run_benchmark(args.resolutions, args.iterations, args.c,
+                            active_set=args.active_set, precision=args.precision)
+    write_results(results, args.output)
@@ -1,37 +1,102 @@
 # Assignment 1: NumPy Array Manipulation for 2D Pattern Generation
 
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
 import random
 import colorsys
+import os
+import time
+import hashlib
+from decimal import Decimal, localcontext
+# matplotlib, PIL, the process pools and shared_memory are imported inside the functions that use them,
+# so importing this file for the compute functions (e.g. in a worker process) stays fast and has no side effects
 
 #Following coding is inspired by https://realpython.com/mandelbrot-set-python/, https://medium.com/@er_95882/animating-fractals-with-python-julia-and-maldelbrot-sets-e65a04549423
 # https://medium.com/data-science/create-stunning-fractal-art-with-python-a-tutorial-for-beginners-c83817fcb64b, https://nseverkar.medium.com/intro-to-drawing-fractals-with-python-6ad53bbc8208 
 # and CHAT GPT for fixes!
 # additional julia set found in julia set generator: https://squaresmagic.com/julia-set 
 
+# Numeric precision of the fractal kernels: (real dtype, complex dtype)
+PRECISIONS = {
+    "double": (np.float64, np.complex128),
+    "single": (np.float32, np.complex64), # half the memory traffic, fine at the default zoom level
+}
+
+# Smallest unsigned type that fits every escape count, the double path keeps the platform int
+def escape_dtype(n_iterations, precision="double"):
+    if precision == "double":
+        return int
+    return np.uint16 if n_iterations < 65536 else np.uint32
+
+# Function to create the real and imaginary axes of the grid
+def grid_axes(xmin, xmax, ymin, ymax, pixel_density, precision="double"):
+    real_dtype = PRECISIONS[precision][0]
+    real = np.linspace(xmin, xmax, num=max(1, int((xmax-xmin) * pixel_density)), dtype=real_dtype) #real axis
+    imag = np.linspace(ymin, ymax, num=max(1, int((ymax-ymin) * pixel_density)), dtype=real_dtype) #imaginary axis
+    return real, imag
+
 # Function to create a grid of complex numbers
-def complex_grid(xmin, xmax, ymin, ymax, pixel_density):
-    real = np.linspace(xmin, xmax, num=max(1, int((xmax-xmin) * pixel_density))) #real axis
-    imag = np.linspace(ymin, ymax, num=max(1, int((ymax-ymin) * pixel_density))) #imaginary axis
+def complex_grid(xmin, xmax, ymin, ymax, pixel_density, precision="double"):
+    real, imag = grid_axes(xmin, xmax, ymin, ymax, pixel_density, precision)
     xx, yy = np.meshgrid(real, imag) #creates a grid of coordinates
     return xx + 1j * yy #combines real and imaginary parts into complex numbe
 
-# Fractal generation function
-def fractal_set(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations): #generates the fractal set (Mandelbrot or Julia) based on the provided parameters.
-    z_grid = complex_grid(xmin, xmax, ymin, ymax, pixel_density) #creates a grid of complex numbers
+# Function to create one tile of the grid, same values as the matching slice of complex_grid
+def complex_grid_tile(real, imag, row0, row1, col0, col1):
+    return real[col0:col1][np.newaxis, :] + np.complex64(1j) * imag[row0:row1][:, np.newaxis] #complex64 unit keeps the axes dtype
+
+# Start values for the iteration
+def start_values(z_grid, c):
     if c == 0: 
         # Mandelbrot, each point is its own constant start at z = 0
         C = z_grid.copy()
         Z = np.zeros_like(z_grid)
     else:
         # Julia, c is fixed. Each point starts at z = point coordinate.
-        C = np.full(z_grid.shape, c, dtype=complex)
+        C = np.full(z_grid.shape, c, dtype=z_grid.dtype)
         Z = z_grid.copy()
+    return Z, C
+
+# Fractal generation function
+def fractal_set(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations, active_set=False, interior=False, precision="double",
+                strategy="brute", symmetry=False, channels=False, trap=("point", 0)): #generates the fractal set (Mandelbrot or Julia) based on the provided parameters.
+    z_grid = complex_grid(xmin, xmax, ymin, ymax, pixel_density, precision) #creates a grid of complex numbers
+    if channels:
+        return escape_channels(z_grid, c, n_iterations, trap=trap, precision=precision) #dict of per-pixel channels
+    if strategy == "subdivide":
+        escape, skipped = subdivide_escape_time(z_grid, c, n_iterations, precision=precision) #call it directly for the skipped fraction
+        return escape
+    if strategy != "brute":
+        raise ValueError(f"unknown strategy {strategy!r}, use 'brute' or 'subdivide'")
+    return escape_time(z_grid, c, n_iterations, active_set=active_set, interior=interior, precision=precision,
+                       symmetry=symmetry)
+
+# Escape time for a grid (or tile) of complex numbers
+def escape_time(z_grid, c, n_iterations, active_set=False, interior=False, precision="double", symmetry=False):
+    Z, C = start_values(z_grid, c)
+    dtype = escape_dtype(n_iterations, precision)
+
+    if symmetry:
+        # only the unique part of a symmetric view is iterated, the rest is mirrored afterwards
+        row_src, col_src = mirror_indices(z_grid, c)
+        mirrored = (row_src >= 0)[:, np.newaxis] & (col_src >= 0)[np.newaxis, :]
+        active = ~mirrored
+        if interior and c == 0:
+            active &= ~mandelbrot_interior(z_grid)
+        escape = escape_time_compact(Z, C, n_iterations, active=active, periodicity=interior and c == 0, dtype=dtype)
+        rows, cols = np.flatnonzero(row_src >= 0), np.flatnonzero(col_src >= 0)
+        escape[np.ix_(rows, cols)] = escape[np.ix_(row_src[rows], col_src[cols])]
+        return escape
+
+    if interior and c == 0:
+        # Mandelbrot interior points never escape, so they are left at 0 without being iterated
+        active = ~mandelbrot_interior(z_grid)
+        return escape_time_compact(Z, C, n_iterations, active=active, periodicity=True, dtype=dtype)
+
+    if active_set:
+        return escape_time_compact(Z, C, n_iterations, dtype=dtype) #same result, only iterates surviving points
     
     mask = np.full(Z.shape, True, dtype=bool) #mask to track which points are still being iterated
-    escape = np.zeros(Z.shape, dtype=int) #how many iterations before escape
+    escape = np.zeros(Z.shape, dtype=dtype) #how many iterations before escape
 
     for i in range(n_iterations): #iterate the function
         Z[mask] = Z[mask] * Z[mask] + C[mask] #update Z for all active points
@@ -43,6 +108,680 @@ def fractal_set(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations): #genera
     
     return escape
 
+# Index of the grid line at -axis[k] for every k, -1 where no grid line lines up with the flipped coordinate
+def mirror_axis(axis):
+    index = np.full(axis.size, -1)
+    if axis.size < 2:
+        return index
+    tol = abs(axis[1] - axis[0]) * 1e-6 #up to rounding, linspace is not exactly symmetric
+    pos = np.clip(np.searchsorted(axis, -axis), 1, axis.size - 1)
+    nearest = np.where(np.abs(axis[pos - 1] + axis) < np.abs(axis[pos] + axis), pos - 1, pos)
+    aligned = np.abs(axis[nearest] + axis) <= tol
+    index[aligned] = nearest[aligned]
+    return index
+
+# Where each row and column of the grid can be copied from, only rows below the real axis are copied
+# Mandelbrot: conj(c) escapes like c, so row -y copies row y. Julia: -z escapes like z, so (-x, -y) copies (x, y)
+def mirror_indices(z_grid, c):
+    real, imag = z_grid[0].real, z_grid[:, 0].imag
+    row_src = np.where(imag < 0, mirror_axis(imag), -1)
+    col_src = np.arange(real.size) if c == 0 else mirror_axis(real)
+    return row_src, col_src
+
+# Main cardioid and period-2 bulb test, these points are inside the Mandelbrot set
+def mandelbrot_interior(z_grid):
+    x = z_grid.real
+    y2 = z_grid.imag ** 2
+    q = (x - 0.25) ** 2 + y2
+    cardioid = q * (q + (x - 0.25)) <= 0.25 * y2
+    bulb = (x + 1) ** 2 + y2 <= 0.0625
+    return cardioid | bulb
+
+# Active-set escape time loop
+def escape_time_compact(Z, C, n_iterations, active=None, periodicity=False, period_tol=1e-13, dtype=int): #same escape counts as the mask loop, but only the surviving points are kept
+    shape = Z.shape
+    if active is None:
+        idx = np.arange(Z.size) #flat index of each active point in the full grid
+        z = Z.ravel().copy() #contiguous copy of the active points
+        cc = np.ascontiguousarray(C.ravel()) #constant for each active point
+    else:
+        idx = np.flatnonzero(active) #only iterate the points that are not already known
+        z = Z.ravel()[idx]
+        cc = C.ravel()[idx]
+
+    zz = np.empty_like(z) #preallocated buffer for z*z
+    radius = np.empty(z.size, dtype=z.real.dtype) #preallocated buffer for |z|
+    escaped = np.empty(z.size, dtype=bool) #preallocated buffer for the escape test
+
+    escaped_idx = [] #flat indices of escaped points, one array per iteration
+    escaped_at = [] #iteration count of each escaped batch
+
+    if periodicity:
+        # Brent-style cycle check: compare z against a value saved at every power of two iteration
+        saved = z.copy()
+        next_save = 1
+
+    for i in range(n_iterations):
+        n = z.size
+        if n == 0:
+            break #stop if all points have escaped
+        np.multiply(z, z, out=zz[:n]) #z*z in place
+        np.add(zz[:n], cc, out=z) #z = z*z + c in place
+        np.abs(z, out=radius[:n]) #|z| in place
+        np.greater(radius[:n], 2, out=escaped[:n]) #check which points have escaped
+        hit = escaped[:n]
+        drop = hit
+        if periodicity:
+            cycled = np.abs(z - saved) < period_tol #orbit came back to the saved value, it will never escape
+            drop = hit | cycled
+        if drop.any():
+            if hit.any():
+                escaped_idx.append(idx[hit])
+                escaped_at.append(i)
+            keep = ~drop #shrink the active set to the survivors
+            z = z[keep]
+            cc = cc[keep]
+            idx = idx[keep]
+            if periodicity:
+                saved = saved[keep]
+        if periodicity and i + 1 == next_save:
+            saved[...] = z
+            next_save *= 2
+
+    escape = np.zeros(Z.size, dtype=dtype) #how many iterations before escape
+    for flat, i in zip(escaped_idx, escaped_at):
+        escape[flat] = i #scatter the escape counts back once at the end
+    return escape.reshape(shape)
+
+# Iterate z from iteration start up to stop, returns the escape iteration (-1 if still bounded) and the final z
+def iterate_stage(z, cc, start, stop):
+    final = z.copy()
+    z = z.copy()
+    idx = np.arange(z.size) #position of each active point in the stage arrays
+    escaped_at = np.full(z.size, -1)
+    zz = np.empty_like(z) #preallocated buffer for z*z
+    radius = np.empty(z.size, dtype=z.real.dtype) #preallocated buffer for |z|
+    for i in range(start, stop):
+        n = z.size
+        if n == 0:
+            break
+        np.multiply(z, z, out=zz[:n])
+        np.add(zz[:n], cc, out=z)
+        np.abs(z, out=radius[:n])
+        hit = radius[:n] > 2
+        if hit.any():
+            escaped_at[idx[hit]] = i
+            keep = ~hit
+            z, cc, idx = z[keep], cc[keep], idx[keep]
+    final[idx] = z #values of the points that are still bounded
+    return escaped_at, final
+
+# Unbounded points next to an escaped point (within radius pixels), the only ones that can still change
+def near_boundary(resolved, radius=2):
+    height, width = resolved.shape
+    padded = np.pad(resolved, radius)
+    rows = np.zeros((height, width + 2 * radius), dtype=bool)
+    for dy in range(2 * radius + 1): #grow along the columns, then along the rows
+        rows |= padded[dy:dy + height]
+    grown = np.zeros_like(resolved)
+    for dx in range(2 * radius + 1):
+        grown |= rows[:, dx:dx + width]
+    return grown & ~resolved
+
+# Adaptive iteration budget: everything runs to start_iterations, then only unresolved points near the boundary
+# continue, growing the budget until the fraction of points that change in a stage drops below tolerance
+def fractal_set_adaptive(xmin, xmax, ymin, ymax, pixel_density, c, start_iterations=100, max_iterations=5000,
+                         growth=2, tolerance=1e-3, boundary_radius=8, precision="double"):
+    z_grid = complex_grid(xmin, xmax, ymin, ymax, pixel_density, precision)
+    Z, C = start_values(z_grid, c)
+    escape = np.zeros(z_grid.shape, dtype=escape_dtype(max_iterations, precision)) #how many iterations before escape
+    resolved = np.zeros(z_grid.shape, dtype=bool) #points that have escaped
+    reached = np.zeros(z_grid.shape, dtype=int) #iterations each point has been run for, Z holds its value at that count
+    active = np.ones(z_grid.shape, dtype=bool) #points iterated in the next stage
+
+    # run the points in flat from iteration start to stop, returns how many of them escaped
+    def advance(flat, start, stop):
+        escaped_at, final = iterate_stage(Z.ravel()[flat], C.ravel()[flat], start, stop)
+        hit = escaped_at >= 0
+        escape.ravel()[flat[hit]] = escaped_at[hit]
+        resolved.ravel()[flat[hit]] = True
+        Z.ravel()[flat] = final
+        reached.ravel()[flat] = stop
+        return np.count_nonzero(hit)
+
+    done, budget = 0, min(start_iterations, max_iterations)
+    history = [] #(budget, fraction of points that escaped in that stage)
+    while True:
+        flat = np.flatnonzero(active)
+        n_hit = 0
+        # points that sat out earlier stages first catch up to done from their own count
+        behind = reached.ravel()[flat]
+        for start in np.unique(behind[behind < done]):
+            n_hit += advance(flat[behind == start], int(start), done)
+        flat = flat[~resolved.ravel()[flat]]
+        n_hit += advance(flat, done, budget) #continue where the last stage stopped
+
+        changed = n_hit / z_grid.size
+        history.append((budget, changed))
+        if (done > 0 and changed < tolerance) or budget >= max_iterations:
+            break
+        done, budget = budget, min(int(budget * growth), max_iterations)
+        active = near_boundary(resolved, boundary_radius) #interior points far from the boundary stop here
+        if not active.any():
+            break
+
+    return escape, history
+
+# Distance from z to an orbit trap: ("point", p), ("circle", center, radius) or ("line", point, angle in radians)
+def trap_distance(z, trap):
+    kind = trap[0]
+    if kind == "point":
+        return np.abs(z - trap[1])
+    if kind == "circle":
+        return np.abs(np.abs(z - trap[1]) - trap[2])
+    if kind == "line":
+        direction = np.exp(-1j * trap[2]) #rotate the line onto the real axis
+        return np.abs(((z - trap[1]) * direction).imag)
+    raise ValueError(f"unknown trap shape {kind!r}")
+
+# Escape time plus the extra channels colourings need, all from the same iteration pass:
+#   escape   - iteration count, same as escape_time
+#   smooth   - continuous iteration count n + 1 - log2(log|z|), normalized by n_iterations (0 inside)
+#   final_abs - |z| when the point escaped, or after the last iteration
+#   trap     - minimum distance of the orbit to the trap shape
+#   distance - distance estimate |z| log|z| / |dz/dc| (Mandelbrot) or / |dz/dz0| (Julia), 0 inside
+def escape_channels(z_grid, c, n_iterations, trap=("point", 0), precision="double"):
+    Z, C = start_values(z_grid, c)
+    size = z_grid.size
+    real_dtype = PRECISIONS[precision][0]
+    z = Z.ravel().copy()
+    cc = np.ascontiguousarray(C.ravel())
+    dz = np.zeros_like(z) if c == 0 else np.ones_like(z) #derivative with respect to c (Mandelbrot) or z0 (Julia)
+    idx = np.arange(size)
+    trap_min = trap_distance(z, trap).astype(real_dtype) if c != 0 else np.full(size, np.inf, dtype=real_dtype)
+
+    escape = np.zeros(size, dtype=escape_dtype(n_iterations, precision))
+    final_abs = np.zeros(size, dtype=real_dtype)
+    dz_abs = np.zeros(size, dtype=real_dtype)
+    trap_out = np.zeros(size, dtype=real_dtype)
+    escaped_mask = np.zeros(size, dtype=bool)
+
+    for i in range(n_iterations):
+        if idx.size == 0:
+            break #stop if all points have escaped
+        dz = 2 * z * dz + (1 if c == 0 else 0) #chain rule, before z is updated
+        z = z * z + cc
+        np.minimum(trap_min, trap_distance(z, trap), out=trap_min)
+        radius = np.abs(z)
+        hit = radius > 2
+        if hit.any():
+            out = idx[hit]
+            escape[out] = i
+            final_abs[out] = radius[hit]
+            dz_abs[out] = np.abs(dz[hit])
+            trap_out[out] = trap_min[hit]
+            escaped_mask[out] = True
+            keep = ~hit #shrink the active set to the survivors
+            z, cc, dz, idx, trap_min = z[keep], cc[keep], dz[keep], idx[keep], trap_min[keep]
+
+    # points that never escaped
+    final_abs[idx] = np.abs(z)
+    trap_out[idx] = trap_min
+
+    smooth = np.zeros(size, dtype=real_dtype)
+    distance = np.zeros(size, dtype=real_dtype)
+    e = escaped_mask
+    log_abs = np.log(final_abs[e])
+    smooth[e] = (escape[e] + 1 - np.log2(log_abs)) / n_iterations
+    with np.errstate(divide="ignore"):
+        distance[e] = np.where(dz_abs[e] > 0, final_abs[e] * log_abs / dz_abs[e], np.inf)
+
+    shape = z_grid.shape
+    return {
+        "escape": escape.reshape(shape),
+        "smooth": smooth.reshape(shape),
+        "final_abs": final_abs.reshape(shape),
+        "trap": trap_out.reshape(shape),
+        "distance": distance.reshape(shape),
+    }
+
+# Concatenated ranges start, start + step, ... (count values each), and which range every value came from
+def stacked_ranges(starts, counts, step=1):
+    owner = np.repeat(np.arange(starts.size), counts)
+    offsets = np.arange(owner.size) - np.repeat(np.cumsum(counts) - counts, counts) #position inside its own range
+    return starts[owner] + step * offsets, owner
+
+# Flat indices of every pixel of a batch of rectangles (rows r0..r1-1, columns c0..c1-1), and the rectangle of each
+def rect_pixels(r0, r1, c0, c1, width):
+    rows, owner = stacked_ranges(r0, r1 - r0)
+    return stacked_ranges(rows * width + c0[owner], (c1 - c0)[owner])[0], np.repeat(owner, (c1 - c0)[owner])
+
+# Mariani-Silver subdivision: only compute rectangle borders, fill rectangles whose border is uniform
+# every level is handled for all rectangles at once. The first min_depth levels are always split, and rectangles larger
+# than trust_size are only filled when a samples x samples spot check of the inside agrees with the border
+def subdivide_escape_time(z_grid, c, n_iterations, min_size=8, precision="double", min_depth=2, samples=5, trust_size=48):
+    Z, C = start_values(z_grid, c)
+    Z, C = Z.ravel(), C.ravel()
+    height, width = z_grid.shape
+    dtype = escape_dtype(n_iterations, precision)
+    escape = np.zeros(z_grid.size, dtype=dtype) #how many iterations before escape
+    state = np.zeros(z_grid.size, dtype=np.int64) #escape count, or -1 for never escaped (a count of 0 can also mean escaped on iteration 0)
+    known = np.zeros(z_grid.size, dtype=bool) #points that are computed or filled
+    pending = np.zeros(z_grid.size, dtype=bool) #scratch mask to drop duplicate indices without sorting
+    computed = 0
+
+    def compute(flat): #iterate only the points that are not known yet
+        nonlocal computed
+        pending[flat[~known[flat]]] = True
+        flat = np.flatnonzero(pending)
+        pending[flat] = False
+        escape[flat] = escape_time_compact(Z[flat], C[flat], n_iterations, dtype=dtype)
+        bounded = (escape[flat] == 0) & (np.abs(Z[flat] * Z[flat] + C[flat]) <= 2) #count 0 but did not escape on iteration 0
+        state[flat] = np.where(bounded, -1, escape[flat])
+        known[flat] = True
+        computed += flat.size
+
+    def border(r0, r1, c0, c1): #the four edges of every rectangle, each edge grouped per rectangle
+        return [stacked_ranges(r0 * width + c0, c1 - c0)[0], stacked_ranges((r1 - 1) * width + c0, c1 - c0)[0],
+                stacked_ranges(r0 * width + c0, r1 - r0, width)[0], stacked_ranges(r0 * width + c1 - 1, r1 - r0, width)[0]]
+
+    r0, r1, c0, c1 = (np.array([v], dtype=np.int64) for v in (0, height, 0, width))
+    level = 0
+    while r0.size:
+        edges = border(r0, r1, c0, c1)
+        compute(np.concatenate(edges)) #every border of this level in one batch
+
+        # per rectangle lowest and highest state over its border
+        low = np.min([np.minimum.reduceat(state[e], np.cumsum(n) - n) for e, n in zip(edges, [c1 - c0, c1 - c0, r1 - r0, r1 - r0])], axis=0)
+        high = np.max([np.maximum.reduceat(state[e], np.cumsum(n) - n) for e, n in zip(edges, [c1 - c0, c1 - c0, r1 - r0, r1 - r0])], axis=0)
+        fill = (low == high) & (level >= min_depth)
+
+        # spot check the inside of large uniform rectangles, all in one batch
+        check = fill & ((r1 - r0 > trust_size) | (c1 - c0 > trust_size))
+        if check.any():
+            steps = np.linspace(0, 1, samples)
+            rows = (r0[check, None] + 1 + steps * (r1 - r0 - 3)[check, None]).astype(np.int64)
+            cols = (c0[check, None] + 1 + steps * (c1 - c0 - 3)[check, None]).astype(np.int64)
+            inside = rows[:, :, None] * width + cols[:, None, :] #(rectangles, samples, samples)
+            compute(inside.ravel())
+            fill[check] = (state[inside] == low[check, None, None]).all(axis=(1, 2))
+
+        if fill.any():
+            # uniform border (and inside), the whole rectangle gets the same escape count
+            flat, owner = rect_pixels(r0[fill], r1[fill], c0[fill], c1[fill], width)
+            flat, owner = flat[~known[flat]], owner[~known[flat]]
+            state[flat] = low[fill][owner]
+            escape[flat] = np.maximum(low[fill][owner], 0)
+            known[flat] = True
+
+        small = ~fill & ((r1 - r0 <= min_size) | (c1 - c0 <= min_size))
+        if small.any():
+            compute(rect_pixels(r0[small], r1[small], c0[small], c1[small], width)[0]) #small rectangles are computed pixel by pixel
+
+        # split the rest into four rectangles that share their middle row and column
+        rest = ~fill & ~small
+        r0, r1, c0, c1 = r0[rest], r1[rest], c0[rest], c1[rest]
+        rm, cm = (r0 + r1) // 2, (c0 + c1) // 2
+        r0, r1, c0, c1 = (np.concatenate([r0, r0, rm, rm]), np.concatenate([rm + 1, rm + 1, r1, r1]),
+                          np.concatenate([c0, cm, c0, cm]), np.concatenate([cm + 1, c1, cm + 1, c1]))
+        level += 1
+
+    skipped = 1.0 - computed / z_grid.size #fraction of pixels that were filled instead of iterated
+    return escape.reshape(height, width), skipped
+
+# Tiled fractal generation, peak memory depends on tile_size instead of the image size
+def fractal_set_tiled(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations, tile_size=512, memmap_path=None, interior=False,
+                      precision="double"):
+    real, imag = grid_axes(xmin, xmax, ymin, ymax, pixel_density, precision) #only the 1D axes are kept in memory
+    shape = (imag.size, real.size)
+    dtype = escape_dtype(n_iterations, precision)
+
+    if memmap_path is not None:
+        escape = np.lib.format.open_memmap(memmap_path, mode="w+", dtype=dtype, shape=shape) #escape array on disk
+    else:
+        escape = np.zeros(shape, dtype=dtype) #preallocated escape array
+
+    for row0 in range(0, shape[0], tile_size):
+        row1 = min(row0 + tile_size, shape[0])
+        for col0 in range(0, shape[1], tile_size):
+            col1 = min(col0 + tile_size, shape[1])
+            z_tile = complex_grid_tile(real, imag, row0, row1, col0, col1) #grid coordinates for this tile only
+            escape[row0:row1, col0:col1] = escape_time(z_tile, c, n_iterations, active_set=True, interior=interior,
+                                                             precision=precision) #iterate the tile on its own
+
+    if memmap_path is not None:
+        escape.flush() #write the remaining pages to disk
+    return escape
+
+# ------ Row-band parallelism ------ #
+# one image split into horizontal bands, NumPy releases the GIL inside the ufuncs so threads run in parallel
+
+# Split the rows into bands of roughly equal cost, estimated from a coarse low-iteration probe
+# rows through the slow interior cost more, so they end up in more and smaller bands
+def band_edges(real, imag, c, n_iterations, n_bands, probe_iterations=64, probe_step=8):
+    probe_rows = np.arange(0, imag.size, probe_step)
+    probe = complex_grid_tile(real[::probe_step], imag, 0, imag.size, 0, real.size)[probe_rows]
+    limit = min(n_iterations, probe_iterations)
+    escape = escape_time(probe, c, limit, active_set=True)
+    # unescaped probe points are assumed to run all n_iterations, escaped ones stop early
+    cost = np.where(escape > 0, escape + 1, n_iterations).sum(axis=1).astype(float)
+    row_cost = np.interp(np.arange(imag.size), probe_rows, cost) + 1.0
+    cumulative = np.cumsum(row_cost)
+    targets = cumulative[-1] * np.arange(1, n_bands) / n_bands
+    edges = np.searchsorted(cumulative, targets) + 1
+    return np.unique(np.concatenate([[0], edges, [imag.size]]))
+
+# One band of rows, written straight into the shared escape array
+def render_band(escape, real, imag, row0, row1, c, n_iterations, precision="double"):
+    z_band = complex_grid_tile(real, imag, row0, row1, 0, real.size)
+    escape[row0:row1] = escape_time(z_band, c, n_iterations, active_set=True, precision=precision) #band drops out once it has escaped
+
+# Process pool variant: the escape array lives in a multiprocessing.shared_memory block
+def render_band_shared(shm_name, shape, dtype, real, imag, row0, row1, c, n_iterations, precision="double"):
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        escape = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        render_band(escape, real, imag, row0, row1, c, n_iterations, precision)
+        del escape #release the buffer before closing
+    finally:
+        shm.close()
+
+# Fractal generation spread over a pool of workers, bands_per_worker > 1 lets fast workers pick up slow bands
+def fractal_set_parallel(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations, workers=None, executor="thread",
+                         bands_per_worker=4, precision="double"):
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    from multiprocessing import shared_memory
+    workers = workers or os.cpu_count() or 1
+    real, imag = grid_axes(xmin, xmax, ymin, ymax, pixel_density, precision)
+    shape = (imag.size, real.size)
+    dtype = np.dtype(escape_dtype(n_iterations, precision))
+    edges = band_edges(real, imag, c, n_iterations, workers * bands_per_worker)
+    bands = list(zip(edges[:-1], edges[1:]))
+
+    if executor == "thread":
+        escape = np.zeros(shape, dtype=dtype) #shared output buffer, every band writes its own rows
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            jobs = [pool.submit(render_band, escape, real, imag, row0, row1, c, n_iterations, precision) for row0, row1 in bands]
+            for job in jobs:
+                job.result() #raise errors from the workers
+        return escape
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = [pool.submit(render_band_shared, shm.name, shape, dtype, real, imag, row0, row1, c, n_iterations, precision)
+                    for row0, row1 in bands]
+            for job in jobs:
+                job.result()
+        escape = np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return escape
+
+# ------ Inverse iteration (MIIM) ------ #
+# the Julia boundary drawn directly by iterating z -> +-sqrt(z - c) backwards, cost follows the boundary pixels
+
+# Hit counts of the Julia boundary on the complex_grid of the view (0 = not on the boundary)
+# every pixel accepts at most max_hits preimages, which prunes the over-visited parts of the backward tree
+def julia_miim(xmin, xmax, ymin, ymax, pixel_density, c, max_hits=16, batch_size=100000, max_points=100_000_000):
+    real, imag = grid_axes(xmin, xmax, ymin, ymax, pixel_density)
+    dx = (real[-1] - real[0]) / max(1, real.size - 1) or (xmax - xmin)
+    dy = (imag[-1] - imag[0]) / max(1, imag.size - 1) or (ymax - ymin)
+
+    # the hit grid covers the view and the disk that holds the whole Julia set, at the view's pixel spacing
+    radius = (1 + np.sqrt(1 + 4 * abs(c))) / 2
+    left = max(0, int(np.ceil((real[0] + radius) / dx)))
+    right = max(0, int(np.ceil((radius - real[-1]) / dx)))
+    below = max(0, int(np.ceil((imag[0] + radius) / dy)))
+    above = max(0, int(np.ceil((radius - imag[-1]) / dy)))
+    width, height = left + real.size + right, below + imag.size + above
+    x0, y0 = real[0] - left * dx, imag[0] - below * dy
+    hits = np.zeros(width * height, dtype=np.uint16)
+
+    # start on the repelling fixed point, it lies on the Julia set
+    roots = (1 + np.sqrt(complex(1 - 4 * c)) * np.array([1, -1])) / 2
+    stack = [roots[np.argmax(np.abs(roots))][np.newaxis]]
+    processed = 0
+
+    while stack and processed < max_points:
+        z = stack.pop()
+        w = np.sqrt(z - c)
+        pre = np.concatenate([w, -w]) #both preimages
+
+        col = np.rint((pre.real - x0) / dx).astype(np.int64)
+        row = np.rint((pre.imag - y0) / dy).astype(np.int64)
+        inside = (col >= 0) & (col < width) & (row >= 0) & (row < height)
+        pre, pix = pre[inside], (row * width + col)[inside]
+
+        pix, first = np.unique(pix, return_index=True) #one point per pixel per batch
+        pre = pre[first]
+        keep = hits[pix] < max_hits #prune pixels that have been visited enough
+        pre, pix = pre[keep], pix[keep]
+        hits[pix] += 1
+        processed += pre.size
+
+        for start in range(0, pre.size, batch_size):
+            stack.append(pre[start:start + batch_size])
+
+    hits = hits.reshape(height, width)
+    return hits[below:below + imag.size, left:left + real.size] #crop to the view
+
+# High precision orbit z -> z*z + c, rounded to complex128 once it is computed
+def reference_orbit(z_real, z_imag, c_real, c_imag, n_iterations, digits):
+    with localcontext() as ctx:
+        ctx.prec = digits # enough digits to resolve one pixel of the deep zoom view
+        x, y = Decimal(z_real), Decimal(z_imag)
+        cx, cy = Decimal(c_real), Decimal(c_imag)
+        orbit = [complex(float(x), float(y))]
+        for _ in range(n_iterations):
+            x, y = x * x - y * y + cx, 2 * x * y + cy
+            orbit.append(complex(float(x), float(y)))
+            if x * x + y * y > 4:
+                break #stop the reference once it has escaped
+    return np.array(orbit)
+
+# Deep zoom renderer: one high precision reference orbit, every pixel iterated as a double precision delta from it
+def fractal_set_deep(center_real, center_imag, width, c, n_iterations, n_pixels=1000):
+    # center and width as strings or Decimals, so they keep more digits than a float can hold
+    width = Decimal(width)
+    digits = max(30, -width.adjusted() + 20)
+
+    # pixel offsets from the center, tiny but well inside the float64 exponent range
+    offsets = np.linspace(-float(width) / 2, float(width) / 2, n_pixels)
+    delta = offsets[np.newaxis, :] + 1j * offsets[:, np.newaxis]
+
+    if c == 0:
+        # Mandelbrot: z starts at 0 for the reference and every pixel, the pixels differ in their constant
+        orbits = reference_orbit(0, 0, center_real, center_imag, n_iterations, digits)
+        crit_start = 0
+        dz = np.zeros(delta.size, dtype=complex)
+        dc = delta.ravel().copy()
+    else:
+        # Julia: the pixels differ in their start value, rebased pixels continue on the orbit of 0
+        ref = reference_orbit(center_real, center_imag, c.real, c.imag, n_iterations, digits)
+        crit = reference_orbit(0, 0, c.real, c.imag, n_iterations, digits)
+        orbits = np.concatenate([ref, crit])
+        crit_start = ref.size
+        dz = delta.ravel().copy()
+        dc = 0
+
+    idx = np.arange(delta.size) #flat index of each active pixel
+    pos = np.zeros(delta.size, dtype=int) #position of each pixel on the reference orbit
+    end = np.full(delta.size, (crit_start or orbits.size) - 1) #last usable position of that orbit
+    escape = np.zeros(delta.size, dtype=int) #how many iterations before escape
+
+    for i in range(n_iterations):
+        if idx.size == 0:
+            break #stop if all points have escaped
+        Z = orbits[pos]
+        dz = 2 * Z * dz + dz * dz + dc #delta iteration, (Z + dz)^2 + c - (Z^2 + c_ref)
+        pos += 1
+        z = orbits[pos] + dz #full value of the pixel
+        radius = np.abs(z)
+
+        escaped = radius > 2 #check which points have escaped
+        escape[idx[escaped]] = i
+
+        # glitch: the pixel got closer to 0 than to the reference, or the reference ran out. Rebase onto 0's orbit
+        rebase = (radius < np.abs(dz)) | (pos == end)
+        dz = np.where(rebase, z, dz)
+        pos[rebase] = crit_start
+        end[rebase] = orbits.size - 1
+
+        keep = ~escaped #shrink the active set to the survivors
+        idx, dz, pos, end = idx[keep], dz[keep], pos[keep], end[keep]
+        if c == 0:
+            dc = dc[keep]
+
+    return escape.reshape(delta.shape)
+
+# Fraction of pixels whose escape count differs from the double precision reference
+def precision_mismatch(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations, precision="single"):
+    reference = fractal_set(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations, active_set=True)
+    candidate = fractal_set(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations, active_set=True, precision=precision)
+    return float(np.mean(reference != candidate))
+
+# ------ Cost model and time-budgeted planning ------ #
+# time = per_loop * loops + per_pixel * pixels + per_pixel_iteration * pixel_iterations, fitted on coarse probe renders
+
+# Pixel-iterations the active-set loop spends per pixel of a probe, for every budget in iterations
+def probe_work(z_grid, c, escape, iterations):
+    Z, C = start_values(z_grid, c)
+    bounded = (escape == 0) & ~(np.abs(Z * Z + C) > 2) #0 also means escaped on the first iteration
+    counts = escape[~bounded] + 1
+    return np.array([np.minimum(counts, n).sum() + (np.count_nonzero(bounded) + np.count_nonzero(counts > n)) * n
+                     for n in iterations], dtype=float) / escape.size, bounded.any()
+
+# Least squares with every coefficient >= 0, small enough to try every subset of the terms
+def fit_nonnegative(A, b):
+    best, best_error = np.zeros(A.shape[1]), np.inf
+    for subset in range(1, 2 ** A.shape[1]):
+        columns = [k for k in range(A.shape[1]) if subset >> k & 1]
+        x, *_ = np.linalg.lstsq(A[:, columns], b, rcond=None)
+        if (x < 0).any():
+            continue #timing noise can make a term negative, the smaller models cover that case
+        error = np.sum((A[:, columns] @ x - b) ** 2)
+        if error < best_error:
+            best = np.zeros(A.shape[1])
+            best[columns] = x
+            best_error = error
+    return best
+
+# Choose pixel_density and n_iterations so the render of the view fits in time_budget seconds
+def plan_render(xmin, xmax, ymin, ymax, c, time_budget, max_pixel_density=1000, max_iterations=500,
+                min_pixel_density=50, min_iterations=50, probe_density=40, calibration=1.0):
+    # probes at three sizes separate the per-loop overhead, the per-pixel setup and the per-iteration work
+    rows, times = [], []
+    for density in (probe_density, 2 * probe_density, 4 * probe_density):
+        start = time.perf_counter()
+        z_grid = complex_grid(xmin, xmax, ymin, ymax, density)
+        escape = escape_time(z_grid, c, max_iterations, active_set=True)
+        times.append(time.perf_counter() - start)
+        work, bounded = probe_work(z_grid, c, escape, [max_iterations])
+        loops = max_iterations if bounded else int(escape.max()) + 1
+        rows.append([loops, escape.size, work[0] * escape.size])
+
+    per_loop, per_pixel, per_work = fit_nonnegative(np.array(rows, dtype=float), np.array(times))
+    # large renders run out of cache, calibration (actual / predicted of an earlier job) scales the small probes up
+    per_loop, per_pixel, per_work = per_loop * calibration, per_pixel * calibration, per_work * calibration
+
+    # escape histogram of the finest probe gives the work per pixel for every smaller budget
+    candidates = sorted({max(min_iterations, int(max_iterations * f)) for f in (1, 0.75, 0.5, 0.35, 0.25, 0.15, 0.1)},
+                        reverse=True)
+    work_per_pixel, _ = probe_work(z_grid, c, escape, candidates)
+    area = (xmax - xmin) * (ymax - ymin)
+
+    plan = None
+    for n_iterations, work in zip(candidates, work_per_pixel):
+        # largest density whose predicted time fits the budget at this iteration count
+        room = time_budget - per_loop * n_iterations
+        density = int(np.sqrt(room / ((per_pixel + per_work * work) * area))) if room > 0 else 0
+        density = min(density, max_pixel_density)
+        plan = {"pixel_density": max(density, min_pixel_density), "n_iterations": n_iterations}
+        if density >= min_pixel_density:
+            break #keep as many iterations as possible, resolution goes first
+    pixels = area * plan["pixel_density"] ** 2
+    work = work_per_pixel[candidates.index(plan["n_iterations"])]
+    plan["predicted_seconds"] = float(per_loop * plan["n_iterations"] + (per_pixel + per_work * work) * pixels)
+    plan["model"] = {"per_loop": float(per_loop), "per_pixel": float(per_pixel), "per_pixel_iteration": float(per_work)}
+    plan["calibration"] = calibration
+    return plan
+
+# Plan, render and report predicted versus actual time
+def render_with_budget(xmin, xmax, ymin, ymax, c, time_budget, **plan_options):
+    plan = plan_render(xmin, xmax, ymin, ymax, c, time_budget, **plan_options)
+    start = time.perf_counter()
+    escape = fractal_set(xmin, xmax, ymin, ymax, plan["pixel_density"], c, plan["n_iterations"], active_set=True)
+    plan["actual_seconds"] = time.perf_counter() - start
+    plan["calibration"] = plan.get("calibration", 1.0) * plan["actual_seconds"] / plan["predicted_seconds"] #pass to the next plan
+    print(f"c = {c}: pixel_density {plan['pixel_density']}, n_iterations {plan['n_iterations']}, "
+          f"predicted {plan['predicted_seconds']:.2f} s, actual {plan['actual_seconds']:.2f} s")
+    return escape, plan
+
+# ------ Escape array cache ------ #
+# escape arrays are stored on disk under a hash of the render parameters, so re-colouring and duplicate renders are free
+
+# File name of a cached escape array
+def escape_cache_key(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations, precision="double"):
+    params = (float(xmin), float(xmax), float(ymin), float(ymax), pixel_density, complex(c), n_iterations, precision)
+    return hashlib.sha256(repr(params).encode()).hexdigest()[:32]
+
+# Delete the least recently used cache files until the cache fits in max_bytes
+def evict_escape_cache(cache_dir, max_bytes):
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith((".npy", ".npz")): #temporary files end in .tmp and are never evicted
+            path = os.path.join(cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue #another worker evicted it already
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries): #oldest first
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass #another worker evicted it already
+        total -= size
+
+# fractal_set with an on-disk cache, compute is called on a miss (defaults to the active-set fractal_set)
+def cached_fractal_set(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations, precision="double",
+                       cache_dir="cache", max_bytes=2 * 1024**3, compressed=False, compute=None):
+    os.makedirs(cache_dir, exist_ok=True)
+    key = escape_cache_key(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations, precision)
+    path = os.path.join(cache_dir, key + (".npz" if compressed else ".npy"))
+
+    try:
+        os.utime(path) #mark as recently used
+        if compressed:
+            with np.load(path) as data:
+                return data["escape"]
+        return np.load(path, mmap_mode="r") #memory-mapped, only the pages that are used get read
+    except FileNotFoundError:
+        pass #not cached, or another worker evicted it in the meantime
+
+    if compute is None:
+        escape = fractal_set(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations, active_set=True, precision=precision)
+    else:
+        escape = compute()
+
+    # write to a temporary file first so parallel workers never read a half written array
+    # the .tmp suffix keeps it out of evict_escape_cache, a file handle stops numpy from appending .npy/.npz
+    tmp_path = path + f".{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        if compressed:
+            np.savez_compressed(f, escape=escape)
+        else:
+            np.save(f, escape)
+    os.replace(tmp_path, path)
+    evict_escape_cache(cache_dir, max_bytes)
+    return escape
+
 #color coding functions
 def darken_color(rgb, desaturate=0.4, darken=0.6):
     h, l, s = colorsys.rgb_to_hls(*rgb) #hue, lightness, saturation
@@ -50,7 +789,8 @@ def darken_color(rgb, desaturate=0.4, darken=0.6):
     l *= darken
     return colorsys.hls_to_rgb(h, l, s)
 
-def contrast_colormap():
+# Random pair of contrasting hues as four colour stops, no matplotlib needed
+def contrast_stops():
     hue1 = random.random()
     hue2 = (hue1 + random.uniform(0.45, 0.55)) % 1.0
 
@@ -63,94 +803,293 @@ def contrast_colormap():
         make_color(hue2, 0.6, 0.8),
         make_color(hue2, 0.85, 0.6)
     ]
-    cmap = mcolors.LinearSegmentedColormap.from_list("contrast_cmap", stops, N=1024)
-    return cmap, stops
+    return stops
 
-# Julia set
-# xmin = -1.5; xmax = 1.5
-# ymin = -1.5; ymax = 1.5
+# Colour stops as a matplotlib colormap, only needed on the plotting paths
+def stops_colormap(stops):
+    import matplotlib.colors as mcolors
+    return mcolors.LinearSegmentedColormap.from_list("contrast_cmap", stops, N=1024)
 
-# Mandelbrot set
-xmin = -2.0; xmax = 1.0
-ymin = -1.5; ymax = 1.5
+def contrast_colormap():
+    stops = contrast_stops()
+    return stops_colormap(stops), stops
 
-# Parameters, iterations, zoom & pixel density.
-base_pixel_density = 1000
-base_iterations = 500
-zoom = 1.0 
-pixel_density = min(int(base_pixel_density * zoom), 1000)
-n_iterations = int(base_iterations + np.log2(zoom) * 50)
+# contrast_stops as a lookup table of uint8 colours, same sampling as the matplotlib colormap
+def colormap_lut(stops, n=1024):
+    stops = np.asarray(stops, dtype=float)
+    x = np.linspace(0, 1, n)
+    positions = np.linspace(0, 1, len(stops)) #stops are evenly spaced
+    lut = np.stack([np.interp(x, positions, stops[:, channel]) for channel in range(3)], axis=1)
+    return np.round(lut * 255).astype(np.uint8)
 
-# ------ Generate and save fractal images for various c values ------ #
+# Escape counts to RGB pixels, normalized from min to max like imshow does
+# a fixed low/high range keeps the colours consistent between tiles of one image
+def colorize(escape, lut, low=None, high=None):
+    low = escape.min() if low is None else low
+    high = escape.max() if high is None else high
+    scale = (len(lut) / (high - low)) if high > low else 0.0
+    index = ((escape - low) * scale).astype(np.intp)
+    np.clip(index, 0, len(lut) - 1, out=index)
+    return np.take(lut, index, axis=0) #(height, width, 3) uint8
 
-# c = -0.4 + 0.6j  # Julia
-# c = 0 + 0.8j # lightning like 
-# c = 0.37 + 0.1j # spirals v.1
-# c = -0.7269 + 0.1889j # Tornadoes within Spirals
-# c = -0.8 + 0.156j # classic julia
-# c = 0.355 + 0.355j # torndaoes
-# c = -0.54 + 0.54j # spirals v.2
-# c = 0.355534 - 0.337292j # by chris thomassen
-# c = 0.285 + 0.01j # elephants
-# c = -0.162 + 1.04j # very small lightning
-# c = -1.476 + 0j # deep sea coral
-# c = -0.163 + 0.085j
-# c = -0.29609091 + 0.62491j #2500 iterations! (dont do that, do 1000 max)
+# Caption font, scaled with the image height
+def caption_font(height):
+    from PIL import ImageFont
+    size = max(10, height // 70)
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except OSError:
+        return ImageFont.load_default(size=size)
 
-# ------ Generate and save fractal images for various c values ------ #
+# Save escape counts straight to a PNG, exactly one computed pixel per output pixel
+# pixels can be passed in when they are already coloured (e.g. antialiased)
+def save_raster(escape, stops, background_color, caption, filepath, pixels=None):
+    from PIL import Image, ImageDraw
+    if pixels is None:
+        pixels = colorize(escape, colormap_lut(stops))
+    height, width = escape.shape
+    background = tuple(int(round(v * 255)) for v in background_color)
 
-c_values = [
-    0,  # Mandelbrot
-    -0.4 + 0.6j,
-    0 + 0.8j,
-    0.37 + 0.1j,
-    -0.7269 + 0.1889j,
-    -0.8 + 0.156j,
-    0.355 + 0.355j,
-    -0.54 + 0.54j,
-    0.355534 - 0.337292j,
-    0.285 + 0.01j,
-    -0.162 + 1.04j,
-    -1.476 + 0j,
-    -0.29609091 + 0.62491j,
-    -0.77 - 0.27j,
-    -1.28 + 0.07j,
-]
+    img = Image.new("RGB", (width, height), background) # background fill
+    img.paste(Image.fromarray(pixels, "RGB"), (0, 0))
+
+    draw = ImageDraw.Draw(img)
+    draw.text((width // 2, int(height * 0.98)), caption, fill=(255, 255, 255), anchor="mb", font=caption_font(height))
+    img.save(filepath, format="PNG")
+
+# Pixels whose escape count differs from a 4-neighbour by more than threshold, that is the fractal boundary
+def edge_pixels(escape, threshold=2):
+    e = escape.astype(np.int64)
+    edges = np.zeros(e.shape, dtype=bool)
+    vertical = np.abs(np.diff(e, axis=0)) > threshold
+    horizontal = np.abs(np.diff(e, axis=1)) > threshold
+    edges[:-1] |= vertical
+    edges[1:] |= vertical
+    edges[:, :-1] |= horizontal
+    edges[:, 1:] |= horizontal
+    return edges
+
+# Antialiased colours: only edge pixels are supersampled with a samples x samples sub-grid, the sub-pixel colours are averaged
+# only the edge pixel coordinates are built (from the 1D axes), so memory follows the number of edges, not the image size
+def antialiased_pixels(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations, stops, samples=4, threshold=2,
+                       escape=None, precision="double", batch_size=1 << 18):
+    real, imag = grid_axes(xmin, xmax, ymin, ymax, pixel_density, precision)
+    complex_dtype = PRECISIONS[precision][1]
+    if escape is None:
+        escape = fractal_set_tiled(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations, precision=precision)
+    lut = colormap_lut(stops)
+    low, high = escape.min(), escape.max() #keep the colour range of the base render
+    pixels = colorize(escape, lut, low, high)
+
+    edges = edge_pixels(escape, threshold)
+    if not edges.any():
+        return pixels, 0.0
+
+    # sub-pixel offsets, centred on each pixel, spacing is the distance between grid points
+    dx = (real[1] - real[0]) if real.size > 1 else 0.0
+    dy = (imag[1] - imag[0]) if imag.size > 1 else 0.0
+    steps = (np.arange(samples) + 0.5) / samples - 0.5
+    offsets = (steps[np.newaxis, :] * dx + 1j * steps[:, np.newaxis] * dy).ravel().astype(complex_dtype)
+
+    # edge pixels' sub-grids in (batch, samples^2) batches through the kernel
+    rows, cols = np.nonzero(edges)
+    for start in range(0, rows.size, batch_size):
+        r, q = rows[start:start + batch_size], cols[start:start + batch_size]
+        centres = (real[q] + np.complex64(1j) * imag[r]).astype(complex_dtype) #same values as complex_grid
+        sub_grid = centres[:, np.newaxis] + offsets[np.newaxis, :]
+        sub_escape = escape_time(sub_grid, c, n_iterations, active_set=True, precision=precision)
+        sub_pixels = colorize(sub_escape, lut, low, high).astype(np.float32)
+        pixels[r, q] = np.round(sub_pixels.mean(axis=1)).astype(np.uint8)
+    return pixels, float(edges.mean()) #fraction of pixels that were supersampled
+
+# ------ Julia atlas ------ #
+# many candidate c values at low resolution in one vectorized loop, to pick seeds before full renders
+
+# Grid of candidate c values, rows go from im_min to im_max like complex_grid
+def atlas_c_values(re_min, re_max, im_min, im_max, n_rows, n_cols):
+    re = np.linspace(re_min, re_max, n_cols)
+    im = np.linspace(im_min, im_max, n_rows)
+    return re[np.newaxis, :] + 1j * im[:, np.newaxis]
 
-import os # create output directory
-output_folder = "results" # folder to save images
-os.makedirs(output_folder, exist_ok=True) # create folder if it doesn't exist
+# Julia escape counts for every c in c_grid, one (H, W) image per c, all iterated together
+def julia_atlas(c_grid, xmin, xmax, ymin, ymax, pixel_density, n_iterations, precision="double"):
+    c_grid = np.asarray(c_grid)
+    z_grid = complex_grid(xmin, xmax, ymin, ymax, pixel_density, precision) #same low resolution grid for every c
+    n_c = c_grid.size
+    Z = np.broadcast_to(z_grid, (n_c,) + z_grid.shape) #(n_c, H, W) start values
+    C = np.broadcast_to(c_grid.ravel().astype(z_grid.dtype)[:, np.newaxis, np.newaxis], Z.shape) #each image has its own c
+    escape = escape_time_compact(Z, C, n_iterations, dtype=escape_dtype(n_iterations, precision)) #shrinks as points escape
+    return escape.reshape(c_grid.shape + z_grid.shape)
+
+# Contact sheet of the atlas, each cell coloured on its own and labelled with its c value
+def save_contact_sheet(atlas, c_grid, stops, filepath, gap=2):
+    from PIL import Image, ImageDraw
+    n_rows, n_cols, height, width = atlas.shape
+    lut = colormap_lut(stops)
+    background = tuple(int(round(v * 255)) for v in darken_color(stops[0]))
+
+    sheet = np.empty((n_rows * (height + gap) - gap, n_cols * (width + gap) - gap, 3), dtype=np.uint8)
+    sheet[...] = background # background fill between the cells
+    for row in range(n_rows):
+        for col in range(n_cols):
+            top, left = row * (height + gap), col * (width + gap)
+            sheet[top:top + height, left:left + width] = colorize(atlas[row, col], lut)
+
+    img = Image.fromarray(sheet, "RGB")
+    draw = ImageDraw.Draw(img)
+    font = caption_font(height * 4)
+    for row in range(n_rows):
+        for col in range(n_cols):
+            c = c_grid[row, col]
+            label = f"{c.real:.4f} {'+' if c.imag >= 0 else '-'} {abs(c.imag):.4f}j"
+            draw.text((col * (width + gap) + width // 2, row * (height + gap) + height - 2), label,
+                      fill=(255, 255, 255), anchor="mb", font=font)
+    img.save(filepath, format="PNG")
+
+# Render, colour and save one fractal image (also runs inside the batch worker processes)
+def render_fractal_image(c, xmin, xmax, ymin, ymax, pixel_density, n_iterations, output_folder="results",
+                         max_untiled_density=1000, tile_size=512, raster=True, cache_dir=None, antialias=0,
+                         renderer="escape"):
+    start = time.perf_counter()
+    random.seed() # fresh palette per image, forked workers would otherwise share the parent's random state
 
-for c in c_values:
     # fractal generation
-    fractal_mask = fractal_set(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations)
+    def compute():
+        if renderer == "miim" and c != 0:
+            return julia_miim(xmin, xmax, ymin, ymax, pixel_density, c) #Julia boundary by inverse iteration
+        if pixel_density > max_untiled_density:
+            return fractal_set_tiled(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations, tile_size=tile_size)
+        return fractal_set(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations, active_set=True, symmetry=True)
+
+    if cache_dir is not None and renderer == "escape":
+        fractal_mask = cached_fractal_set(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations,
+                                          cache_dir=cache_dir, compute=compute)
+    else:
+        fractal_mask = compute()
 
     # color generation
-    cmap, color_stops = generate_colormap = contrast_colormap()
+    color_stops = contrast_stops()
+    background_color = darken_color(color_stops[0])
+
+    caption = f"c = {c.real:.6f} {'+' if c.imag >= 0 else '-'} {abs(c.imag):.6f}j | n_iterations = {n_iterations}"
+    filename = f"c_{c.real:+.3f}_{c.imag:+.3f}j.png".replace('+', 'p').replace('-', 'n')
+    filepath = os.path.join(output_folder, filename)
+
+    if raster:
+        # direct PNG from the escape array, no figure
+        pixels = None
+        if antialias > 1 and renderer == "escape":
+            # supersample the boundary pixels with an antialias x antialias sub-grid
+            pixels, _ = antialiased_pixels(xmin, xmax, ymin, ymax, pixel_density, c, n_iterations, color_stops,
+                                           samples=antialias, escape=np.asarray(fractal_mask))
+        save_raster(fractal_mask, color_stops, background_color, caption, filepath, pixels=pixels)
+    else:
+        # Plotting
+        import matplotlib.pyplot as plt
+        plt.figure(figsize=(10,10), dpi=300)
+        plt.imshow(fractal_mask, cmap=stops_colormap(color_stops), extent=[xmin, xmax, ymin, ymax])
+        plt.gca().set_facecolor(background_color)
+        plt.axis('off')
+        plt.text(0.5, 0.02, caption, ha='center', va='bottom', fontsize=10, color='white', transform=plt.gca().transAxes)
+        plt.savefig(filepath, bbox_inches='tight', pad_inches=0)
+        plt.close()
+
+    return {"c": c, "filepath": filepath, "seconds": time.perf_counter() - start}
+
+# Render a list of c values in parallel, each worker process computes, colours and saves its own image
+def render_batch(c_values, xmin, xmax, ymin, ymax, pixel_density, n_iterations, output_folder="results",
+                 max_workers=None, max_untiled_density=1000, tile_size=512, raster=True, cache_dir=None, antialias=0,
+                 renderers=None):
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    os.makedirs(output_folder, exist_ok=True) # create folder if it doesn't exist
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool: # max_workers=None uses every core
+        jobs = [pool.submit(render_fractal_image, c, xmin, xmax, ymin, ymax, pixel_density, n_iterations,
+                            output_folder, max_untiled_density, tile_size, raster, cache_dir, antialias,
+                            (renderers or {}).get(c, "escape")) for c in c_values]
+        for job in as_completed(jobs):
+            result = job.result()
+            print(f"Saved fractal image for c={result['c']} to {result['filepath']} ({result['seconds']:.1f} s)")
+        summary = [job.result() for job in jobs] # same order as c_values
+
+    total = time.perf_counter() - start
+    slowest = max((result["seconds"] for result in summary), default=0.0)
+    print(f"Rendered {len(summary)} images in {total:.1f} s (slowest single image {slowest:.1f} s)")
+    return summary, total
+
+# Mandelbrot map with the highlight points circled, plotted with matplotlib
+def save_highlight_map(points, xmin, xmax, ymin, ymax, pixel_density, n_iterations, output_folder="results",
+                       max_untiled_density=1000, tile_size=512, cache_dir=None):
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as patches # for drawing circles
+
+    # Mandelbrot set parameters
+    g = 0  # Mandelbrot
+    if pixel_density > max_untiled_density:
+        compute = lambda: fractal_set_tiled(xmin, xmax, ymin, ymax, pixel_density, g, n_iterations, tile_size=tile_size)
+    else:
+        compute = None
+    if cache_dir is not None:
+        # same parameters as the c = 0 image of the sweep, so this is read back from the cache
+        fractal_mask_2 = cached_fractal_set(xmin, xmax, ymin, ymax, pixel_density, g, n_iterations,
+                                            cache_dir=cache_dir, compute=compute)
+    elif compute is not None:
+        fractal_mask_2 = compute()
+    else:
+        fractal_mask_2 = fractal_set(xmin, xmax, ymin, ymax, pixel_density, g, n_iterations, active_set=True)
+
+    # Color generation
+    cmap, color_stops = contrast_colormap()
     background_color = darken_color(color_stops[0])
 
     # Plotting
     plt.figure(figsize=(10,10), dpi=300)
-    plt.imshow(fractal_mask, cmap=cmap, extent=[xmin, xmax, ymin, ymax])
+    plt.imshow(fractal_mask_2, cmap=cmap, extent=[xmin, xmax, ymin, ymax])
     plt.gca().set_facecolor(background_color)
-    plt.axis('off')
-    plt.text(0.5, 0.02, f"c = {c.real:.6f} {'+' if c.imag >= 0 else '-'} {abs(c.imag):.6f}j | n_iterations = {n_iterations}",
-    ha='center', va='bottom', fontsize=10, color='white', transform=plt.gca().transAxes)
 
-    filename = f"c_{c.real:+.3f}_{c.imag:+.3f}j.png".replace('+', 'p').replace('-', 'n')
-    filepath = os.path.join(output_folder, filename)
+    # Add circles for each highlight point
+    for point in points:
+        circle = patches.Circle((point.real, point.imag), 0.02, color='white', fill=False, linewidth=1.5)
+        plt.gca().add_patch(circle)
 
+    plt.axis('off')
+    plt.text(0.5, 0.02, f"Mandelbrot Set | n_iterations = {n_iterations}", ha='center', va='bottom', fontsize=10, color='white',
+        transform=plt.gca().transAxes)
+
+    os.makedirs(output_folder, exist_ok=True)
+    filepath = os.path.join(output_folder, "mandelbrot_map_cvalues.png")
     plt.savefig(filepath, bbox_inches='tight', pad_inches=0)
     plt.close()
+    return filepath
+
+# Julia set
+JULIA_VIEW = (-1.5, 1.5, -1.5, 1.5)
+
+# Mandelbrot set
+MANDELBROT_VIEW = (-2.0, 1.0, -1.5, 1.5)
 
-    print(f"Saved fractal image for c={c} to {filepath}")
+# past a view width of about 1e-13 float64 runs out of digits, use the perturbation renderer instead, e.g.
+# fractal_set_deep("-0.743643887037158704752191506114774", "0.131825904205311970493132056385139", "1e-14", 0, 20000)
 
-# mandelbrot map with highlighted points
-# points taken from the c_values list above
+# ------ c values for the sweep ------ #
 
-import matplotlib.patches as patches # for drawing circles
+# c = -0.4 + 0.6j  # Julia
+# c = 0 + 0.8j # lightning like 
+# c = 0.37 + 0.1j # spirals v.1
+# c = -0.7269 + 0.1889j # Tornadoes within Spirals
+# c = -0.8 + 0.156j # classic julia
+# c = 0.355 + 0.355j # torndaoes
+# c = -0.54 + 0.54j # spirals v.2
+# c = 0.355534 - 0.337292j # by chris thomassen
+# c = 0.285 + 0.01j # elephants
+# c = -0.162 + 1.04j # very small lightning
+# c = -1.476 + 0j # deep sea coral
+# c = -0.163 + 0.085j
+# c = -0.29609091 + 0.62491j #2500 iterations! (dont do that, do 1000 max)
 
-highlight_points = [
+c_values = [
+    0,  # Mandelbrot
     -0.4 + 0.6j,
     0 + 0.8j,
     0.37 + 0.1j,
@@ -167,29 +1106,58 @@ highlight_points = [
     -1.28 + 0.07j,
 ]
 
-# Mandelbrot set parameters
-g = 0  # Mandelbrot
-fractal_mask_2 = fractal_set(xmin, xmax, ymin, ymax, pixel_density, g, n_iterations)
+# points circled on the Mandelbrot map, the Julia c values of the sweep
+highlight_points = [c for c in c_values if c != 0]
+
+# ------ Generate and save fractal images for various c values ------ #
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Render the A1 Mandelbrot and Julia images for the c_values sweep")
+    parser.add_argument("--output", default="results", help="folder to save images")
+    parser.add_argument("--c", type=lambda text: [complex(value) for value in text.split(",")], default=c_values,
+                        help="comma separated c values, e.g. --c=0,-0.4+0.6j (0 = Mandelbrot), default the full sweep")
+    parser.add_argument("--density", type=int, default=1000, help="base pixel density (pixels per unit)")
+    parser.add_argument("--iterations", type=int, default=500, help="base iteration count")
+    parser.add_argument("--zoom", type=float, default=1.0, help="scales the density, 50 more iterations per doubling")
+    parser.add_argument("--max-untiled-density", type=int, default=1000, help="above this the image is rendered in tiles to bound memory")
+    parser.add_argument("--tile-size", type=int, default=512)
+    parser.add_argument("--workers", type=int, default=None, help="render processes for the sweep, default every core")
+    parser.add_argument("--matplotlib", action="store_true", help="save matplotlib figures instead of direct PNGs")
+    parser.add_argument("--cache-dir", default="cache", help="escape arrays are reused on re-runs")
+    parser.add_argument("--no-cache", action="store_true", help="always recompute")
+    parser.add_argument("--antialias", type=int, default=0, help="e.g. 4 to supersample the boundary pixels 4x4, 0 for off")
+    parser.add_argument("--miim", type=lambda text: [complex(value) for value in text.split(",")], default=[],
+                        help="c values drawn by inverse iteration (thin Julia sets), e.g. --miim=0+0.8j,-0.162+1.04j")
+    parser.add_argument("--atlas", action="store_true", help="contact sheet of candidate Julia seeds instead of the sweep")
+    parser.add_argument("--no-map", action="store_true", help="skip the Mandelbrot map with the highlighted points")
+    args = parser.parse_args(argv)
+
+    xmin, xmax, ymin, ymax = MANDELBROT_VIEW
+    pixel_density = int(args.density * args.zoom)
+    n_iterations = int(args.iterations + np.log2(args.zoom) * 50)
+    cache_dir = None if args.no_cache else args.cache_dir
+    renderers = {c: "miim" for c in args.miim}
 
-# Color generation
-cmap, color_stops = contrast_colormap()
-background_color = darken_color(color_stops[0])
+    if args.atlas:
+        # low resolution Julia sets for a grid of c values around the edge of the Mandelbrot set
+        atlas_c = atlas_c_values(-1.5, 0.5, -1.0, 1.0, 16, 16)
+        atlas = julia_atlas(atlas_c, *JULIA_VIEW, 50, 200)
+        os.makedirs(args.output, exist_ok=True)
+        save_contact_sheet(atlas, atlas_c, contrast_stops(), os.path.join(args.output, "julia_atlas.png"))
+        print(f"Saved Julia atlas for {atlas_c.size} c values to {args.output}")
+        return
 
-# Plotting
-plt.figure(figsize=(10,10), dpi=300)
-plt.imshow(fractal_mask_2, cmap=cmap, extent=[xmin, xmax, ymin, ymax])
-plt.gca().set_facecolor(background_color)
+    # one process per image, max_workers=None uses every core
+    render_batch(args.c, xmin, xmax, ymin, ymax, pixel_density, n_iterations, args.output,
+                 max_workers=args.workers, max_untiled_density=args.max_untiled_density, tile_size=args.tile_size,
+                 raster=not args.matplotlib, cache_dir=cache_dir, antialias=args.antialias, renderers=renderers)
 
-# Add circles for each highlight point
-for point in highlight_points:
-    circle = patches.Circle((point.real, point.imag), 0.02, color='white', fill=False, linewidth=1.5)
-    plt.gca().add_patch(circle)
+    if not args.no_map:
+        # mandelbrot map with highlighted points
+        filepath = save_highlight_map(highlight_points, xmin, xmax, ymin, ymax, pixel_density, n_iterations, args.output,
+                                      args.max_untiled_density, args.tile_size, cache_dir)
+        print(f"Saved Mandelbrot image with highlighted points to {filepath}")
 
-plt.axis('off')
-plt.text(0.5, 0.02, f"Mandelbrot Set | n_iterations = {n_iterations}", ha='center', va='bottom', fontsize=10, color='white',
-    transform=plt.gca().transAxes)
 
-filepath = os.path.join(output_folder, "mandelbrot_map_cvalues.png")
-plt.savefig(filepath, bbox_inches='tight', pad_inches=0)
-plt.close()
-print(f"Saved Mandelbrot image with highlighted points to {filepath}")
\ No newline at end of file
+if __name__ == "__main__": # guard so the batch worker processes can import this file
+    main()
@@ -0,0 +1,142 @@
+# Deep zoom tile pyramid for the A1 Mandelbrot/Julia views
+# XYZ layout: level z splits the view into 2^z x 2^z tiles, saved as <output>/<z>/<x>/<y>.png (or .npy)
+# tile y = 0 is at ymin, the same orientation as the A1 PNGs
+
+import argparse
+import json
+import math
+import os
+
+import numpy as np
+from PIL import Image
+
+from pattern_generator import JULIA_VIEW, MANDELBROT_VIEW, colorize, colormap_lut, contrast_stops, escape_time
+
+TILE_SIZE = 256
+
+# Complex plane bounds of one tile
+def tile_bounds(view, z, x, y):
+    xmin, xmax, ymin, ymax = view
+    width = (xmax - xmin) / 2**z
+    height = (ymax - ymin) / 2**z
+    return xmin + x * width, xmin + (x + 1) * width, ymin + y * height, ymin + (y + 1) * height
+
+# Pixel centre grid of one tile, so neighbouring tiles never share a row or column
+def tile_grid(view, z, x, y, tile_size=TILE_SIZE):
+    txmin, txmax, tymin, tymax = tile_bounds(view, z, x, y)
+    offsets = (np.arange(tile_size) + 0.5) / tile_size
+    real = txmin + offsets * (txmax - txmin)
+    imag = tymin + offsets * (tymax - tymin)
+    return real[np.newaxis, :] + 1j * imag[:, np.newaxis]
+
+# Iteration budget per level, same rule as zoom in pattern_generator.py (50 more per doubling)
+def level_iterations(base_iterations, z):
+    return int(base_iterations + z * 50)
+
+# Escape counts of one tile
+def render_tile(view, z, x, y, c, base_iterations, tile_size=TILE_SIZE, precision="double"):
+    grid = tile_grid(view, z, x, y, tile_size)
+    if precision == "single":
+        grid = grid.astype(np.complex64)
+    return escape_time(grid, c, level_iterations(base_iterations, z), active_set=True, precision=precision)
+
+# Tile indices at level z that overlap the region (xmin, xmax, ymin, ymax) of the view
+def tiles_in_region(view, z, region):
+    xmin, xmax, ymin, ymax = view
+    n = 2**z
+    rx0, rx1, ry0, ry1 = region
+    x0 = max(0, math.floor((rx0 - xmin) / (xmax - xmin) * n))
+    x1 = min(n, math.ceil((rx1 - xmin) / (xmax - xmin) * n))
+    y0 = max(0, math.floor((ry0 - ymin) / (ymax - ymin) * n))
+    y1 = min(n, math.ceil((ry1 - ymin) / (ymax - ymin) * n))
+    return [(x, y) for x in range(x0, x1) for y in range(y0, y1)]
+
+# Path of one tile in the XYZ layout
+def tile_path(output_dir, z, x, y, fmt="png"):
+    return os.path.join(output_dir, str(z), str(x), f"{y}.{fmt}")
+
+# Save one tile, colours use the fixed 0..n_iterations range so tiles line up without seams
+def save_tile(escape, path, lut, n_iterations, fmt="png"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    if fmt == "npy":
+        with open(tmp_path, "wb") as f:
+            np.save(f, escape)
+    else:
+        Image.fromarray(colorize(escape, lut, 0, n_iterations), "RGB").save(tmp_path, format="PNG")
+    os.replace(tmp_path, path) #never leave a half written tile that would be skipped next time
+
+# Read the manifest of an existing pyramid, or start a new one
+def load_manifest(output_dir):
+    path = os.path.join(output_dir, "manifest.json")
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return None
+
+# Render every missing tile inside the region for levels min_zoom..max_zoom and write the manifest
+def generate_pyramid(output_dir, c, max_zoom, base_iterations=500, view=None, region=None, min_zoom=0,
+                     tile_size=TILE_SIZE, fmt="png", stops=None, precision="double"):
+    view = tuple(view or (MANDELBROT_VIEW if c == 0 else JULIA_VIEW))
+    region = region or view
+    manifest = load_manifest(output_dir)
+
+    if manifest is not None:
+        # keep the palette and layout of the existing pyramid, so new tiles match the old ones
+        same = (manifest["c"] == [c.real, c.imag] and tuple(manifest["view"]) == view and manifest["tile_size"] == tile_size
+                and manifest["base_iterations"] == base_iterations and manifest["format"] == fmt)
+        if not same:
+            raise ValueError(f"{output_dir} holds a pyramid with different parameters")
+        stops = manifest["stops"]
+    elif stops is None:
+        stops = contrast_stops()
+    lut = colormap_lut(stops)
+
+    levels = {} if manifest is None else manifest["levels"]
+    for z in range(min_zoom, max_zoom + 1):
+        n_iterations = level_iterations(base_iterations, z)
+        rendered = skipped = 0
+        for x, y in tiles_in_region(view, z, region):
+            path = tile_path(output_dir, z, x, y, fmt)
+            if os.path.exists(path):
+                skipped += 1 #already on disk
+                continue
+            escape = render_tile(view, z, x, y, c, base_iterations, tile_size, precision)
+            save_tile(escape, path, lut, n_iterations, fmt)
+            rendered += 1
+        levels[str(z)] = {"tiles_per_side": 2**z, "n_iterations": n_iterations}
+        print(f"Level {z}: rendered {rendered} tiles, skipped {skipped} on disk")
+
+    manifest = {
+        "layout": "xyz",
+        "path": "{z}/{x}/{y}." + fmt,
+        "c": [c.real, c.imag],
+        "view": list(view),
+        "tile_size": tile_size,
+        "format": fmt,
+        "base_iterations": base_iterations,
+        "precision": precision,
+        "stops": [list(stop) for stop in stops],
+        "levels": levels,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate an XYZ tile pyramid of a Mandelbrot or Julia view")
+    parser.add_argument("output_dir")
+    parser.add_argument("--c", type=complex, default=0, help="Julia c value, e.g. --c=-0.4+0.6j (0 = Mandelbrot)")
+    parser.add_argument("--max-zoom", type=int, default=4)
+    parser.add_argument("--min-zoom", type=int, default=0)
+    parser.add_argument("--iterations", type=int, default=500, help="iterations at level 0")
+    parser.add_argument("--region", type=float, nargs=4, metavar=("XMIN", "XMAX", "YMIN", "YMAX"),
+                        help="only render tiles that overlap this part of the view")
+    parser.add_argument("--format", choices=["png", "npy"], default="png")
+    parser.add_argument("--precision", choices=["double", "single"], default="double")
+    args = parser.parse_args()
+
+    generate_pyramid(args.output_dir, complex(args.c), args.max_zoom, args.iterations, region=args.region,
+                     min_zoom=args.min_zoom, fmt=args.format, precision=args.precision)
@@ -0,0 +1,220 @@
+# Local tile server for exploring Mandelbrot and Julia sets in the browser
+# serves /{c}/{z}/{x}/{y}.png tiles (same XYZ layout as tile_pyramid.py), rendered on demand in a worker pool
+# standard library only, listens on localhost. Open http://127.0.0.1:8000/ for a small viewer
+# (the viewer page loads Leaflet from unpkg.com, so the browser needs internet access, the tiles themselves do not)
+
+import argparse
+import asyncio
+import cmath
+import io
+import os
+import random
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote
+
+from PIL import Image
+
+from pattern_generator import colorize, colormap_lut, contrast_stops
+from tile_pyramid import JULIA_VIEW, MANDELBROT_VIEW, TILE_SIZE, level_iterations, render_tile, tile_path
+
+MAX_ZOOM = 40 # past this the tiles are narrower than float64 can resolve
+
+VIEWER_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>A1 fractal explorer</title>
+<link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css">
+<script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+<style>html, body, #map { height: 100%; margin: 0; background: #000; } #c { position: absolute; z-index: 1000; top: 10px; right: 10px; }</style>
+</head>
+<body>
+<input id="c" value="-0.4+0.6j" title="c value, 0 = Mandelbrot">
+<div id="map"></div>
+<script>
+var map = L.map("map", {crs: L.CRS.Simple, minZoom: 0, maxZoom: 40}).setView([-128, 128], 1);
+var layer = null;
+function show(c) {
+  if (layer) { map.removeLayer(layer); }
+  layer = L.tileLayer("/" + encodeURIComponent(c) + "/{z}/{x}/{y}.png", {noWrap: true, tileSize: 256, maxZoom: 40,
+    bounds: [[-256, 0], [0, 256]]}).addTo(map);
+}
+document.getElementById("c").addEventListener("change", function (e) { show(e.target.value); });
+show(document.getElementById("c").value);
+</script>
+</body>
+</html>
+"""
+
+# One spelling per c value (0, 0j, 0.0 and -0 are the same), used for the cache keys, the palette seed and the disk path
+def canonical_c(c):
+    c = complex(c.real + 0.0, c.imag + 0.0) #adding 0.0 turns -0.0 into 0.0
+    return repr(c).strip("()")
+
+# Palette for one c value, the same on every run so tiles from the disk cache match new ones
+def palette_for(c_text):
+    state = random.getstate()
+    random.seed(c_text)
+    stops = contrast_stops()
+    random.setstate(state)
+    return stops
+
+# Render one tile to PNG bytes (runs in the worker pool)
+def render_tile_png(view, z, x, y, c, base_iterations, stops, tile_size=TILE_SIZE):
+    escape = render_tile(view, z, x, y, c, base_iterations, tile_size)
+    pixels = colorize(escape, colormap_lut(stops), 0, level_iterations(base_iterations, z))
+    buf = io.BytesIO()
+    Image.fromarray(pixels, "RGB").save(buf, format="PNG")
+    return buf.getvalue()
+
+# Small in-memory LRU cache of encoded tiles
+class TileCache:
+    def __init__(self, max_items=2048):
+        self.max_items = max_items
+        self.items = OrderedDict()
+
+    def get(self, key):
+        data = self.items.get(key)
+        if data is not None:
+            self.items.move_to_end(key) #mark as recently used
+        return data
+
+    def put(self, key, data):
+        self.items[key] = data
+        self.items.move_to_end(key)
+        while len(self.items) > self.max_items:
+            self.items.popitem(last=False) #drop the least recently used tile
+
+
+class TileServer:
+    def __init__(self, pool, base_iterations=500, cache_items=2048, cache_dir=None):
+        self.pool = pool
+        self.base_iterations = base_iterations
+        self.cache = TileCache(cache_items)
+        self.cache_dir = cache_dir
+        self.palettes = {}
+
+    # PNG bytes of one tile: memory cache, then disk cache, then render in the pool
+    async def tile(self, c_text, c, z, x, y):
+        key = (c_text, z, x, y)
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+
+        disk_path = None
+        if self.cache_dir is not None:
+            disk_path = tile_path(os.path.join(self.cache_dir, f"{c_text}_{self.base_iterations}"), z, x, y)
+            if os.path.exists(disk_path):
+                with open(disk_path, "rb") as f:
+                    data = f.read()
+                self.cache.put(key, data)
+                return data
+
+        if c_text not in self.palettes:
+            self.palettes[c_text] = palette_for(c_text)
+        view = MANDELBROT_VIEW if c == 0 else JULIA_VIEW
+        loop = asyncio.get_running_loop()
+        # cancelling this await also cancels the pool job if it has not started yet
+        data = await loop.run_in_executor(self.pool, render_tile_png, view, z, x, y, c, self.base_iterations,
+                                          self.palettes[c_text])
+        self.cache.put(key, data)
+
+        if disk_path is not None:
+            os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+            with open(disk_path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(disk_path + ".tmp", disk_path)
+        return data
+
+    # Parse /{c}/{z}/{x}/{y}.png, returns None for anything else
+    def parse_tile_path(self, path):
+        parts = path.strip("/").split("/")
+        if len(parts) != 4 or not parts[3].endswith(".png"):
+            return None
+        c = complex(unquote(parts[0]).replace(" ", ""))
+        if not cmath.isfinite(c):
+            raise ValueError(f"c must be finite, got {c}")
+        c_text = canonical_c(c)
+        c = complex(c_text) #same value for every spelling
+        z, x, y = int(parts[1]), int(parts[2]), int(parts[3][:-4])
+        if not (0 <= z <= MAX_ZOOM and 0 <= x < 2**z and 0 <= y < 2**z):
+            return None
+        return c_text, c, z, x, y
+
+    # One HTTP request per connection, the tile is dropped if the browser goes away before it is ready
+    async def handle(self, reader, writer):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass #skip the headers
+            parts = request.decode("latin-1").split()
+            if len(parts) < 2 or parts[0] != "GET":
+                await self.respond(writer, 405, b"method not allowed", "text/plain")
+                return
+
+            path = parts[1].split("?")[0]
+            if path in ("/", "/index.html"):
+                await self.respond(writer, 200, VIEWER_HTML.encode(), "text/html; charset=utf-8")
+                return
+
+            try:
+                parsed = self.parse_tile_path(path)
+            except ValueError:
+                await self.respond(writer, 400, b"bad tile path", "text/plain")
+                return
+            if parsed is None:
+                await self.respond(writer, 404, b"not found", "text/plain")
+                return
+
+            render = asyncio.ensure_future(self.tile(*parsed))
+            gone = asyncio.ensure_future(reader.read(1)) #completes when the browser closes the connection
+            done, _ = await asyncio.wait({render, gone}, return_when=asyncio.FIRST_COMPLETED)
+            if render not in done:
+                render.cancel() #tile scrolled out of view
+                return
+            gone.cancel()
+            try:
+                data = render.result()
+            except Exception as error: #e.g. a broken pool or an error in the worker
+                print(f"Tile {path} failed: {error!r}")
+                await self.respond(writer, 500, b"tile rendering failed", "text/plain")
+                return
+            await self.respond(writer, 200, data, "image/png")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, body, content_type):
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                  500: "Internal Server Error"}[status]
+        head = (f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+                f"Cache-Control: {'max-age=3600' if status == 200 else 'no-store'}\r\nConnection: close\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(host="127.0.0.1", port=8000, workers=None, base_iterations=500, cache_items=2048, cache_dir=None):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        server = TileServer(pool, base_iterations, cache_items, cache_dir)
+        listener = await asyncio.start_server(server.handle, host, port)
+        print(f"Serving fractal tiles on http://{host}:{port}/")
+        async with listener:
+            await listener.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve Mandelbrot/Julia tiles rendered on demand")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="render processes, default every core")
+    parser.add_argument("--iterations", type=int, default=500, help="iterations at zoom level 0")
+    parser.add_argument("--cache-items", type=int, default=2048, help="tiles kept in memory")
+    parser.add_argument("--cache-dir", default=None, help="also keep rendered tiles on disk")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.iterations, args.cache_items, args.cache_dir))
+    except KeyboardInterrupt:
+        pass
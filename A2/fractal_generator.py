@@ -9,9 +9,40 @@ This script generates fractal patterns using recursive functions and geometric t
 
 import math
 import random
+import numpy as np
 import matplotlib.pyplot as plt
 from shapely.geometry import LineString
 
+#------------------------------------------------------------------------------------------------------#
+# Compact sequence encoding
+#------------------------------------------------------------------------------------------------------#
+
+# one signed byte per symbol, the value is the turn direction (any other symbol is a straight step)
+L, R = 1, -1
+
+def encode_sequence(seq):
+    """
+    Convert an L/R sequence (list, string or array) into an int8 array.
+    Arrays that are already int8 are returned as they are, without a copy.
+    """
+    if isinstance(seq, np.ndarray):
+        return seq.astype(np.int8, copy=False)
+    if isinstance(seq, LazySequence):
+        return seq.to_array()
+    return np.array([L if s == "L" else R if s == "R" else 0 for s in seq], dtype=np.int8)
+
+def decode_sequence(seq):
+    """
+    Convert an int8 sequence back into a list of "L"/"R" strings.
+    """
+    return ["L" if s == L else "R" if s == R else "F" for s in np.asarray(seq).tolist()]
+
+def sequence_length(start_length, iterations):
+    """
+    Length of the sequence after the given number of S -> S S R iterations.
+    """
+    return start_length * 2**iterations + 2**iterations - 1
+
 #------------------------------------------------------------------------------------------------------#
 # grammar rule
 #------------------------------------------------------------------------------------------------------#
@@ -21,21 +52,169 @@ def evolve_sequence(seq):
     Duplicate sequence and append a right turn.
     Basic generative rule: S -> S S R
     """
+    if isinstance(seq, np.ndarray):
+        return np.concatenate([seq, seq, np.array([R], dtype=seq.dtype)])
     return seq + seq + ["R"]
 
+def evolve_in_place(buffer, length):
+    """
+    Apply S -> S S R to the first `length` symbols of a preallocated buffer.
+    The copy and the trailing right turn are written behind the current sequence,
+    so no new array is made. Returns the new length.
+    """
+    buffer[length:2 * length] = buffer[:length]
+    buffer[2 * length] = R
+    return 2 * length + 1
+
+#------------------------------------------------------------------------------------------------------#
+# Lazy sequence
+#------------------------------------------------------------------------------------------------------#
+
+class LazySequence:
+    """
+    Generation n of S -> S S R without building it.
+    Generation n is 2^(n-k) copies of generation k, and after copy j come as many
+    right turns as j has trailing zero bits. Symbols are read from that structure:
+      - len(seq)
+      - seq[i] in O(n) = O(log len) steps, seq[a:b:c] as an int8 array
+      - seq.chunks(size) streams int8 blocks, memory stays at one block
+    """
+
+    def __init__(self, start_sequence, iterations):
+        self.start = encode_sequence(start_sequence)
+        self.iterations = iterations
+
+    def __len__(self):
+        return sequence_length(len(self.start), self.iterations)
+
+    def _lengths(self):
+        return [sequence_length(len(self.start), g) for g in range(self.iterations + 1)]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._lookup(np.arange(*index.indices(len(self))))
+
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("sequence index out of range")
+        return int(self._lookup(np.array([index]))[0])
+
+    def _lookup(self, indices):
+        """
+        Symbols at an array of indices: walk down the generations, the second copy
+        maps back onto the first and the last position of each generation is the R.
+        """
+        indices = indices.astype(np.int64)
+        out = np.zeros(len(indices), dtype=np.int8)
+        found = np.zeros(len(indices), dtype=bool)
+        lengths = self._lengths()
+
+        for g in range(self.iterations, 0, -1):
+            half = lengths[g - 1]
+            turn = ~found & (indices == 2 * half)
+            out[turn] = R
+            found |= turn
+            indices = np.where(indices >= half, indices - half, indices)
+
+        out[~found] = self.start[indices[~found]]
+        return out
+
+    def _pieces(self, size):
+        """
+        Copies of the largest generation that fits in one block, each followed by its right turns.
+        """
+        lengths = self._lengths()
+        k = max([g for g in range(self.iterations + 1) if lengths[g] <= size], default=0)
+
+        block = np.empty(lengths[k], dtype=np.int8)
+        block[:len(self.start)] = self.start
+        length = len(self.start)
+        for _ in range(k):
+            length = evolve_in_place(block, length)
+
+        turns = np.full(self.iterations - k, R, dtype=np.int8)
+        for j in range(1, 2**(self.iterations - k) + 1):
+            yield block
+            trailing = (j & -j).bit_length() - 1
+            if trailing:
+                yield turns[:trailing]
+
+    def chunks(self, size=1 << 16):
+        """
+        Stream the sequence as int8 blocks of `size` symbols (the last one can be shorter).
+        """
+        pending = []
+        count = 0
+        for piece in self._pieces(size):
+            pending.append(piece)
+            count += len(piece)
+            if count >= size:
+                joined = np.concatenate(pending)
+                for i in range(0, len(joined) - size + 1, size):
+                    yield joined[i:i + size]
+                rest = joined[len(joined) - len(joined) % size:]
+                pending = [rest]
+                count = len(rest)
+        if count:
+            yield np.concatenate(pending)
+
+    def __iter__(self):
+        for block in self.chunks():
+            yield from block.tolist()
+
+    def to_array(self):
+        """
+        Materialize the whole sequence as one int8 array.
+        """
+        return np.concatenate(list(self.chunks()))
+
+def sequence_blocks(seq, size=1 << 16):
+    """
+    Iterate any sequence form (list, array, LazySequence, or an iterator of blocks) as int8 blocks.
+    """
+    if isinstance(seq, LazySequence):
+        yield from seq.chunks(size)
+    elif isinstance(seq, (list, tuple, str, np.ndarray)):
+        seq = encode_sequence(seq)
+        for i in range(0, len(seq), size):
+            yield seq[i:i + size]
+    else:
+        for block in seq:
+            yield encode_sequence(block)
+
 #------------------------------------------------------------------------------------------------------#
 # randomness application
 #------------------------------------------------------------------------------------------------------#
 
-def apply_randomness_chunked(seq, randomness, chunk_size=6):
+def apply_randomness_chunked(seq, randomness, chunk_size=6, inplace=False):
     """
     Apply randomness in blocks rather than symbol-by-symbol noise.
     randomness: probability of flipping a whole chunk
     chunk_size: number of consecutive turns affected together
+    inplace: flip an int8 array (or a view of the generation buffer) directly instead of a copy
+    A LazySequence is not built: the flipped symbols are returned as a stream of int8 blocks.
     """
     if randomness <= 0:
         return seq
 
+    if isinstance(seq, LazySequence):
+        # blocks are a whole number of chunks, so the draws line up with the array version
+        size = chunk_size * max(1, (1 << 16) // chunk_size)
+        return (apply_randomness_chunked(block.copy(), randomness, chunk_size, inplace=True)
+                for block in seq.chunks(size))
+
+    if isinstance(seq, np.ndarray):
+        # one random draw per chunk, in the same order as the list version so seeds give the same curve
+        n_chunks = -(-len(seq) // chunk_size)
+        flips = np.array([random.random() < randomness for _ in range(n_chunks)], dtype=bool)
+        mask = np.repeat(flips, chunk_size)[:len(seq)]
+
+        new = seq if inplace else seq.copy()
+        new[mask] = np.where(new[mask] == L, R, L)
+        return new
+
     new = seq[:]
     i = 0
 
@@ -103,6 +282,49 @@ def apply_spatial_influence(
 # Sequence to Points Conversion
 #------------------------------------------------------------------------------------------------------#
 
+def turtle_points(seq, step=2, angle_deg=90):
+    """
+    Vectorized turtle for the case without a spatial field.
+    The heading after each symbol is (running sum of the turns) * angle, and the positions
+    are a running sum of the steps, so each block of symbols is a few np.cumsum calls.
+    When the angle divides 360 the cos/sin of the few possible headings come from a table.
+    Returns an (N+1, 2) float array.
+    """
+    angle = math.radians(angle_deg)
+    period = abs(360 / angle_deg) if angle_deg else 0
+    if period and abs(period - round(period)) < 1e-9 and round(period) <= 4096:
+        period = round(period)
+        cos_table = step * np.cos(np.arange(period) * angle)
+        sin_table = step * np.sin(np.arange(period) * angle)
+    else:
+        period = None
+
+    turns = 0
+    x, y = 0.0, 0.0
+    blocks = [np.zeros((1, 2))]
+
+    for block in sequence_blocks(seq):
+        if not len(block):
+            continue
+        # heading after each symbol, in units of angle (kept below period on the table path, so int32 is enough)
+        k = turns + np.cumsum(block, dtype=np.int32 if period is not None else np.int64)
+
+        if period is not None:
+            k %= period
+            dx, dy = cos_table[k], sin_table[k]
+        else:
+            dx, dy = step * np.cos(k * angle), step * np.sin(k * angle)
+        turns = int(k[-1])
+
+        # the last point of the previous block is the first term, so blocks join up
+        dx[0] += x
+        dy[0] += y
+        xs, ys = np.cumsum(dx), np.cumsum(dy)
+        x, y = xs[-1], ys[-1]
+        blocks.append(np.column_stack([xs, ys]))
+
+    return np.concatenate(blocks)
+
 def sequence_to_points(
     seq,
     step=2,
@@ -113,7 +335,12 @@ def sequence_to_points(
 ):
     """
     Convert L/R grammar into a polyline, optionally affected by spatial fields.
+    seq can be a list of "L"/"R" strings, an int8 array from encode_sequence,
+    a LazySequence or a stream of int8 blocks (read one block at a time).
+    Without a field this is turtle_points (an (N+1, 2) array), the loop below is only used by the field modes.
     """
+    if attractor_strength <= 0 or mode == "none":
+        return turtle_points(seq, step, angle_deg)
 
     x, y = 0.0, 0.0
     heading = 0.0
@@ -121,28 +348,73 @@ def sequence_to_points(
 
     angle = math.radians(angle_deg)
 
-    for cmd in seq:
+    for block in sequence_blocks(seq):
+        for turn in block.tolist():
 
-        # grammar turn
-        if cmd == "L": heading += angle
-        elif cmd == "R": heading -= angle
+            # grammar turn (+1 = L, -1 = R)
+            heading += turn * angle
 
-        # spatial field influence
-        heading, step = apply_spatial_influence(
-            x, y, heading,
-            attractor_point,
-            attractor_strength,
-            mode,
-            step
-        )
+            # spatial field influence
+            heading, step = apply_spatial_influence(
+                x, y, heading,
+                attractor_point,
+                attractor_strength,
+                mode,
+                step
+            )
 
-        # forward step
-        x += step * math.cos(heading)
-        y += step * math.sin(heading)
-        pts.append((x, y))
+            # forward step
+            x += step * math.cos(heading)
+            y += step * math.sin(heading)
+            pts.append((x, y))
 
     return pts
 
+#------------------------------------------------------------------------------------------------------#
+# Self-similar Doubling
+#------------------------------------------------------------------------------------------------------#
+
+def heading_direction(turns, angle_deg):
+    """
+    Unit vector of the heading after a net number of turns, reduced modulo a full turn
+    when the angle divides 360 so large turn counts stay exact.
+    """
+    period = abs(360 / angle_deg) if angle_deg else 0
+    if period and abs(period - round(period)) < 1e-9:
+        turns %= round(period)
+    heading = turns * math.radians(angle_deg)
+    return math.cos(heading), math.sin(heading)
+
+def doubling_generations(start_sequence, iterations, step=2, angle_deg=90):
+    """
+    Points of every generation of S -> S S R without a spatial field, built from geometry only.
+    The second S of generation n+1 is generation n rotated by its net heading and moved to its end,
+    then the trailing R adds one step. Yields the (N+1, 2) points of generations 0..iterations;
+    they are views of one array of the final size, so earlier generations stay valid.
+    """
+    start = encode_sequence(start_sequence)
+    pts = np.empty((sequence_length(len(start), iterations) + 1, 2))
+    length = len(start) + 1 # points in the current generation
+    pts[:length] = turtle_points(start, step, angle_deg)
+    turns = int(start.sum(dtype=np.int64))
+    yield pts[:length]
+
+    for _ in range(iterations):
+        # second copy: rotate the first one (it starts at the origin with heading 0) onto the end point
+        c, s = heading_direction(turns, angle_deg)
+        rotation = np.array([[c, s], [-s, c]]) # row vectors times this rotate by the heading
+        copy = pts[length:2 * length - 1]
+        np.matmul(pts[1:length], rotation, out=copy)
+        copy += pts[length - 1]
+
+        # trailing right turn and its step
+        turns = 2 * turns - 1
+        c, s = heading_direction(turns, angle_deg)
+        pts[2 * length - 1] = pts[2 * length - 2] + (step * c, step * s)
+
+        length *= 2
+        yield pts[:length]
+
 #------------------------------------------------------------------------------------------------------#
 # Chaikin Smoothing
 #------------------------------------------------------------------------------------------------------#
@@ -151,6 +423,16 @@ def chaikin(points, iterations=2):
     """
     Apply Chaikin corner-cutting to smooth geometry.
     """
+    if isinstance(points, np.ndarray):
+        # same cut points for the whole array at once
+        for _ in range(iterations):
+            p0, p1 = points[:-1], points[1:]
+            new_pts = np.empty((2 * len(p0), 2))
+            new_pts[0::2] = 0.75*p0 + 0.25*p1
+            new_pts[1::2] = 0.25*p0 + 0.75*p1
+            points = new_pts
+        return points
+
     for _ in range(iterations):
         new_pts = []
         for i in range(len(points) - 1):
@@ -193,22 +475,39 @@ def generate_fractal(
     if start_sequence is None:
         start_sequence = ["L", "R", "R", "R", "R", "L", "L"]
 
-    seq = start_sequence[:]
+    start = encode_sequence(start_sequence)
+    field = attractor_strength > 0 and mode != "none"
 
-    # grammar evolution
-    for _ in range(iterations):
-        seq = evolve_sequence(seq)
-        seq = apply_randomness_chunked(seq, randomness, chunk_size)
-
-    # geometry conversion
-    pts = sequence_to_points(
-        seq,
-        step,
-        angle_deg,
-        attractor_point,
-        attractor_strength,
-        mode
-    )
+    if randomness <= 0 and not field:
+        # plain grammar and no field: each generation is the previous one plus a rotated copy
+        for pts in doubling_generations(start, iterations, step, angle_deg):
+            pass
+    else:
+        if randomness <= 0:
+            # plain grammar: the symbols are streamed to the turtle, the sequence is never built
+            seq = LazySequence(start, iterations)
+        else:
+            # one int8 buffer of the final length, every generation doubles in place
+            buffer = np.empty(sequence_length(len(start), iterations), dtype=np.int8)
+            buffer[:len(start)] = start
+            length = len(start)
+
+            # grammar evolution, the flips of each generation are copied into the next
+            for _ in range(iterations):
+                length = evolve_in_place(buffer, length)
+                apply_randomness_chunked(buffer[:length], randomness, chunk_size, inplace=True)
+
+            seq = buffer
+
+        # geometry conversion
+        pts = sequence_to_points(
+            seq,
+            step,
+            angle_deg,
+            attractor_point,
+            attractor_strength,
+            mode
+        )
 
     # optional smoothing
     if smoothing: